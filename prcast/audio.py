@@ -1,82 +1,315 @@
 """TTS rendering -- turn a script into an MP3."""
 
-import tempfile
+import asyncio
+import functools
+import io
 from pathlib import Path
 
+from mutagen.mp3 import MP3, HeaderNotFoundError, MPEGFrame
 from pydub import AudioSegment
 
+try:
+    import av
+except ImportError:  # fall back to pydub, which shells out to ffmpeg
+    av = None
+
 from prcast.config import settings
+from prcast.http_client import get_client
+from prcast.tts_cache import get_or_render
 
 
-async def render_edge_tts(text: str, voice: str, output_path: Path):
-    """Render text to MP3 using Edge TTS."""
+async def render_edge_tts(text: str, voice: str) -> bytes:
+    """Render text to MP3 bytes using Edge TTS."""
     import edge_tts
 
     communicate = edge_tts.Communicate(text, voice)
-    await communicate.save(str(output_path))
-
+    audio = bytearray()
+    async for chunk in communicate.stream():
+        if chunk["type"] == "audio":
+            audio.extend(chunk["data"])
+    return bytes(audio)
 
-async def render_elevenlabs(text: str, voice: str, output_path: Path):
-    """Render text to MP3 using ElevenLabs API."""
-    import httpx
 
-    async with httpx.AsyncClient(timeout=60) as client:
-        resp = await client.post(
-            f"https://api.elevenlabs.io/v1/text-to-speech/{voice}",
-            headers={
-                "xi-api-key": settings.ELEVENLABS_API_KEY,
-                "Content-Type": "application/json",
-            },
-            json={
-                "text": text,
-                "model_id": "eleven_turbo_v2_5",
-                "voice_settings": {
-                    "stability": 0.5,
-                    "similarity_boost": 0.75,
-                },
+async def render_elevenlabs(text: str, voice: str) -> bytes:
+    """Render text to MP3 bytes using ElevenLabs API."""
+    client = await get_client()
+    audio = bytearray()
+    async with client.stream(
+        "POST",
+        f"https://api.elevenlabs.io/v1/text-to-speech/{voice}",
+        headers={
+            "xi-api-key": settings.ELEVENLABS_API_KEY,
+            "Content-Type": "application/json",
+        },
+        json={
+            "text": text,
+            "model_id": "eleven_turbo_v2_5",
+            "voice_settings": {
+                "stability": 0.5,
+                "similarity_boost": 0.75,
             },
-        )
+        },
+        timeout=60,
+    ) as resp:
         resp.raise_for_status()
-        output_path.write_bytes(resp.content)
+        async for data in resp.aiter_bytes():
+            audio.extend(data)
+    return bytes(audio)
 
 
-async def render_segment(text: str, voice: str, output_path: Path):
-    """Render a single text segment to audio."""
+async def render_segment(text: str, voice: str) -> bytes:
+    """Render a single text segment to MP3 bytes."""
     if settings.TTS_PROVIDER == "elevenlabs":
-        await render_elevenlabs(text, voice, output_path)
+        return await render_elevenlabs(text, voice)
+    return await render_edge_tts(text, voice)
+
+
+# Silent MP3 frames keyed by (duration_ms, sample_rate, channels, bitrate),
+# rendered once per process
+_silence_cache: dict[tuple[int, int, int, int], bytes] = {}
+
+
+async def _run_ffmpeg(*args: str) -> bytes:
+    """Run ffmpeg without blocking the event loop. Returns stdout.
+
+    Only used when PyAV is not installed.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y", *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {stderr.decode(errors='replace').strip()}")
+    return stdout
+
+
+def _mp3_params(info) -> tuple[int, int, int, int]:
+    """Stream params that must match for MP3 files to be joined without re-encoding."""
+    return (info.version, info.layer, info.sample_rate, info.channels)
+
+
+async def _silence_mp3(duration_ms: int, info) -> bytes:
+    """Silent MP3 with the same sample rate, channels and bitrate as `info` (mutagen MPEGInfo)."""
+    key = (duration_ms, info.sample_rate, info.channels, info.bitrate)
+    if key in _silence_cache:
+        return _silence_cache[key]
+
+    layout = "mono" if info.channels == 1 else "stereo"
+    # Bare frames only: these bytes get spliced into the middle of a stream
+    if av is not None:
+        buf = io.BytesIO()
+        with av.open(
+            buf, "w", format="mp3", options={"write_xing": "0", "id3v2_version": "0"}
+        ) as container:
+            stream = container.add_stream("libmp3lame", rate=info.sample_rate, layout=layout)
+            stream.bit_rate = info.bitrate
+            pcm = _pause_pcm(duration_ms, info.sample_rate, 2, info.channels)
+            _mux_pcm(container, stream, pcm, info.sample_rate, info.channels)
+        _silence_cache[key] = buf.getvalue()
     else:
-        await render_edge_tts(text, voice, output_path)
+        _silence_cache[key] = await _run_ffmpeg(
+            "-f", "lavfi",
+            "-i", f"anullsrc=r={info.sample_rate}:cl={layout}",
+            "-t", f"{duration_ms / 1000}",
+            "-c:a", "libmp3lame",
+            "-b:a", f"{max(info.bitrate // 1000, 8)}k",
+            "-write_xing", "0", "-id3v2_version", "0",
+            "-f", "mp3", "pipe:1",
+        )
+    return _silence_cache[key]
+
+
+def _decode_mp3_to_pcm(
+    data: bytes,
+    rate: int | None = None,
+    channels: int | None = None,
+) -> tuple[bytes, int, int, int]:
+    """Decode MP3 bytes to interleaved 16-bit PCM, optionally resampling.
+
+    Returns (pcm, rate, channels, sample_width). Uses PyAV in-process when
+    available; pydub spawns one ffmpeg per call and is only the fallback.
+    """
+    if av is None:
+        seg = AudioSegment.from_file(io.BytesIO(data), format="mp3")
+        if rate:
+            seg = seg.set_frame_rate(rate).set_channels(channels)
+        seg = seg.set_sample_width(2)
+        return seg.raw_data, seg.frame_rate, seg.channels, 2
+
+    with av.open(io.BytesIO(data)) as container:
+        stream = container.streams.audio[0]
+        rate = rate or stream.rate
+        channels = channels or stream.channels
+        resampler = av.AudioResampler(
+            format="s16", layout="mono" if channels == 1 else "stereo", rate=rate
+        )
+        pcm = bytearray()
+        frames = list(container.decode(stream)) + [None]  # None flushes the resampler
+        for frame in frames:
+            for out in resampler.resample(frame):
+                pcm.extend(bytes(out.planes[0])[: out.samples * channels * 2])
+    return bytes(pcm), rate, channels, 2
+
+
+def _encode_mp3(pcm: bytes, rate: int, channels: int, output_path: Path):
+    """Encode interleaved 16-bit PCM to a VBR MP3 file at settings.MP3_QUALITY."""
+    if av is None:
+        AudioSegment(
+            data=pcm, sample_width=2, frame_rate=rate, channels=channels
+        ).export(
+            str(output_path), format="mp3", parameters=["-q:a", str(settings.MP3_QUALITY)]
+        )
+        return
+
+    layout = "mono" if channels == 1 else "stereo"
+    with av.open(str(output_path), "w", format="mp3") as container:
+        # LAME VBR, equivalent to `ffmpeg -q:a N` (global_quality is N * FF_QP2LAMBDA)
+        stream = container.add_stream(
+            "libmp3lame",
+            rate=rate,
+            layout=layout,
+            options={
+                "flags": "+qscale",
+                "global_quality": str(settings.MP3_QUALITY * 118),
+            },
+        )
+        _mux_pcm(container, stream, pcm, rate, channels)
+
+
+def _mux_pcm(container, stream, pcm: bytes, rate: int, channels: int):
+    """Feed interleaved 16-bit PCM through a PyAV encoder stream and flush it."""
+    layout = "mono" if channels == 1 else "stereo"
+    frame_size = 1152 * 2 * channels  # one MPEG-1 layer III frame of s16 samples
+    for offset in range(0, len(pcm), frame_size):
+        chunk = pcm[offset:offset + frame_size]
+        frame = av.AudioFrame(
+            format="s16", layout=layout, samples=len(chunk) // (2 * channels)
+        )
+        frame.planes[0].update(chunk)
+        frame.sample_rate = rate
+        container.mux(stream.encode(frame))
+    container.mux(stream.encode(None))
+
+
+def _bare_frames(data: bytes) -> bytes | None:
+    """Strip ID3 tags and a leading Xing/Info/VBRI frame, leaving only audio frames.
+
+    Joining segments byte-wise is only safe for bare frames: a tag or VBR
+    header in the middle of the stream breaks decoders, and the first one
+    makes players report the first segment's length for the whole episode.
+    Returns None when no MPEG frame follows the tags.
+    """
+    start = 0
+    # ID3v2: "ID3", version (2), flags (1), syncsafe size (4), optional footer
+    while data[start:start + 3] == b"ID3" and len(data) >= start + 10:
+        size = 0
+        for byte in data[start + 6:start + 10]:
+            size = (size << 7) | (byte & 0x7F)
+        footer = 10 if data[start + 5] & 0x10 else 0
+        start += 10 + size + footer
+
+    buf = io.BytesIO(data)
+    buf.seek(start)
+    try:
+        frame = MPEGFrame(buf)
+    except HeaderNotFoundError:
+        return None
+    # mutagen only clears `sketchy` when the frame holds a Xing/Info/VBRI
+    # header, which carries no audio
+    if not frame.sketchy:
+        start = buf.tell()
+
+    end = len(data)
+    if data[end - 128:end - 125] == b"TAG":  # ID3v1 trailer
+        end -= 128
+    return data[start:end]
+
+
+@functools.lru_cache(maxsize=8)
+def _pause_pcm(duration_ms: int, frame_rate: int, sample_width: int, channels: int) -> bytes:
+    """Silent PCM block for one pause, built once per output format."""
+    frames = frame_rate * duration_ms // 1000
+    return b"\x00" * (frames * sample_width * channels)
+
+
+def _combine_segments(
+    segments_mp3: list[bytes], pause_ms: int
+) -> tuple[bytes, int, int, int]:
+    """Concatenate segments with a pause between each into one preallocated buffer.
+
+    Every segment is decoded once, converted to the first segment's rate and
+    channel count, and copied into a single bytearray. Appending
+    AudioSegments instead re-copies all accumulated audio on every step.
+    Returns (pcm, rate, channels, sample_width).
+    """
+    first, rate, channels, sample_width = _decode_mp3_to_pcm(segments_mp3[0])
+    raw = [first] + [
+        _decode_mp3_to_pcm(data, rate, channels)[0] for data in segments_mp3[1:]
+    ]
+
+    pause = _pause_pcm(pause_ms, rate, sample_width, channels)
+
+    buf = bytearray(sum(len(r) for r in raw) + len(pause) * (len(raw) - 1))
+    view = memoryview(buf)
+    offset = 0
+    for i, r in enumerate(raw):
+        view[offset:offset + len(r)] = r
+        offset += len(r)
+        if i < len(raw) - 1:
+            view[offset:offset + len(pause)] = pause
+            offset += len(pause)
+
+    return bytes(buf), rate, channels, sample_width
 
 
 async def render_episode(
     script: list[dict],
     episode_id: str,
     repo_slug: str,
-) -> Path:
-    """Render full episode from script segments. Returns path to final MP3."""
+) -> tuple[Path, int]:
+    """Render full episode from script segments.
+
+    Returns (path to final MP3, duration in milliseconds).
+    """
+    if not script:
+        # Nothing would be written, yet the feed would still list the episode
+        raise ValueError(f"Cannot render episode {episode_id} from an empty script")
+
     output_dir = settings.AUDIO_DIR / repo_slug
     output_dir.mkdir(parents=True, exist_ok=True)
     output_path = output_dir / f"{episode_id}.mp3"
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        segment_paths = []
+    # Render segments concurrently, capped to stay under provider rate limits
+    semaphore = asyncio.Semaphore(settings.TTS_CONCURRENCY)
 
-        for i, segment in enumerate(script):
-            seg_path = Path(tmpdir) / f"seg_{i:03d}.mp3"
+    async def render_one(segment: dict) -> bytes:
+        async with semaphore:
             # Monologue: always use host A voice
-            voice = settings.HOST_A_VOICE
-            await render_segment(segment["text"], voice, seg_path)
-            segment_paths.append(seg_path)
+            return await get_or_render(
+                segment["text"],
+                settings.HOST_A_VOICE,
+                settings.TTS_PROVIDER,
+                render_segment,
+            )
 
-        # Combine segments with natural pauses between paragraphs
-        combined = AudioSegment.empty()
-        pause = AudioSegment.silent(duration=600)  # 600ms between paragraphs
+    segments = await asyncio.gather(*[render_one(segment) for segment in script])
 
-        for seg_path in segment_paths:
-            segment_audio = AudioSegment.from_mp3(str(seg_path))
-            combined += segment_audio + pause
-
-        # Export final episode
-        combined.export(str(output_path), format="mp3", bitrate="128k")
+    # Combine segments with natural pauses between paragraphs (600ms).
+    # TTS output normally shares one format, and MP3 frames are independent,
+    # so once tags and VBR headers are stripped the frames can simply be
+    # joined; only mixed formats need a decode and re-encode. Duration comes
+    # from the MP3 headers, so nothing is decoded to measure it.
+    infos = [MP3(io.BytesIO(data)).info for data in segments]
+    frames = [_bare_frames(data) for data in segments]
+    if len({_mp3_params(info) for info in infos}) == 1 and None not in frames:
+        silence = await _silence_mp3(600, infos[0])
+        output_path.write_bytes(silence.join(frames))
+        duration_ms = int(sum(info.length for info in infos) * 1000) + 600 * (len(infos) - 1)
+    else:
+        pcm, rate, channels, sample_width = _combine_segments(segments, pause_ms=600)
+        _encode_mp3(pcm, rate, channels, output_path)
+        duration_ms = len(pcm) * 1000 // (rate * channels * sample_width)
 
-    return output_path
+    return output_path, duration_ms
@@ -4,16 +4,25 @@ import argparse
 import asyncio
 import sys
 
+from prcast.http_client import close_client
 from prcast.pipeline import process_pr
 
 
+async def _run(repo: str, pr_number: int) -> dict:
+    try:
+        return await process_pr(repo, pr_number)
+    finally:
+        # Shared HTTP client must be closed while its event loop is still running
+        await close_client()
+
+
 def main():
     parser = argparse.ArgumentParser(description="PRCast - AI podcasts from PRs")
     parser.add_argument("repo", help="GitHub repo (owner/repo)")
     parser.add_argument("pr", type=int, help="PR number")
     args = parser.parse_args()
 
-    episode = asyncio.run(process_pr(args.repo, args.pr))
+    episode = asyncio.run(_run(args.repo, args.pr))
     print(f"\nEpisode generated: {episode['title']}")
     print(f"Audio: audio/{episode['repo'].replace('/', '-').lower()}/{episode['audio_file']}")
     print(f"Duration: {episode['duration_seconds']}s")
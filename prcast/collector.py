@@ -1,7 +1,23 @@
 """Collect PR data from GitHub."""
 
-import httpx
+import asyncio
+import hashlib
+import os
+import re
+import time
 from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from pathlib import Path
+
+import orjson
+
+from prcast.config import settings
+from prcast.http_client import get_client
+from prcast.storage import write_atomic
+
+_FILE_SPLIT_RE = re.compile(r"^(?=diff --git )", re.MULTILINE)
+_HUNK_SPLIT_RE = re.compile(r"^(?=@@ )", re.MULTILINE)
+_FILE_HEADER_RE = re.compile(r"diff --git a/\S+ b/(\S+)")
 
 
 @dataclass
@@ -24,6 +40,105 @@ class PRData:
     deletions: int = 0
 
 
+def _is_excluded(path: str) -> bool:
+    return any(
+        fnmatch(path, pattern) or fnmatch(path, f"*/{pattern}")
+        for pattern in settings.DIFF_EXCLUDE
+    )
+
+
+def _filter_hunks(file_diff: str) -> str:
+    header, *hunks = _HUNK_SPLIT_RE.split(file_diff)
+    parts = [header]
+    for hunk in hunks:
+        lines = hunk.count("\n") - 1  # excluding the @@ header
+        if lines > settings.DIFF_MAX_HUNK_LINES:
+            hunk_header = hunk.split("\n", 1)[0]
+            parts.append(f"{hunk_header}\n# ... {lines} line hunk omitted\n")
+        else:
+            parts.append(hunk)
+    return "".join(parts)
+
+
+def _filter_diff(text: str) -> str:
+    """Drop generated/vendored files and oversized hunks from a unified diff.
+
+    Keeps the `diff --git` line of excluded files so the script still knows
+    they changed, without letting lockfiles crowd real code out of the
+    truncated diff.
+    """
+    parts = []
+    for file_diff in _FILE_SPLIT_RE.split(text):
+        if not file_diff:
+            continue
+        match = _FILE_HEADER_RE.match(file_diff)
+        if match and _is_excluded(match.group(1)):
+            header = file_diff.split("\n", 1)[0]
+            parts.append(f"{header}\n# (generated or vendored file omitted)\n")
+        else:
+            parts.append(_filter_hunks(file_diff))
+    return "".join(parts)
+
+
+def _body_cache_path(key: str) -> Path:
+    digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    return settings.FEEDS_DIR / ".http_cache" / digest
+
+
+def _read_cached(cache_path: Path) -> tuple[str, bytes] | None:
+    """(etag, body) from a cache entry, or None if missing or malformed.
+
+    Entries are the ETag on the first line followed by the raw body, so each
+    response is stored and refreshed on its own.
+    """
+    try:
+        etag, body = cache_path.read_bytes().split(b"\n", 1)
+    except (FileNotFoundError, ValueError):
+        return None
+    # Quoted or weak ETag; anything else is an older bare-body entry
+    if not etag.startswith((b'"', b'W/"')):
+        return None
+    return etag.decode("latin-1"), body
+
+
+def _prune_http_cache():
+    """Drop cached responses that have not been served for HTTP_CACHE_MAX_AGE_DAYS."""
+    cache_dir = settings.FEEDS_DIR / ".http_cache"
+    cutoff = time.time() - settings.HTTP_CACHE_MAX_AGE_DAYS * 86400
+    try:
+        with os.scandir(cache_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+    except FileNotFoundError:
+        pass
+
+
+async def _get_conditional(client, url: str, headers: dict) -> bytes:
+    """GET `url` with If-None-Match, serving the cached body on 304 Not Modified.
+
+    GitHub does not count 304 responses against the rate limit. Metadata and
+    diff share a URL, so entries are keyed by Accept header as well.
+    """
+    key = f"{headers['Accept']} {url}"
+    cache_path = _body_cache_path(key)
+    cached = _read_cached(cache_path)
+    if cached:
+        headers = {**headers, "If-None-Match": cached[0]}
+
+    resp = await client.get(url, headers=headers, timeout=30)
+    if resp.status_code == 304 and cached:
+        os.utime(cache_path)  # still in use, keep it out of pruning
+        return cached[1]
+    resp.raise_for_status()
+
+    etag = resp.headers.get("ETag")
+    if etag:
+        # A truncated body paired with a valid ETag would be served on every 304
+        write_atomic(cache_path, etag.encode() + b"\n" + resp.content)
+    return resp.content
+
+
 async def collect_pr(repo: str, pr_number: int, token: str) -> PRData:
     """Fetch full PR context from GitHub API."""
     headers = {
@@ -38,56 +153,60 @@ async def collect_pr(repo: str, pr_number: int, token: str) -> PRData:
 
     base = f"https://api.github.com/repos/{repo}/pulls/{pr_number}"
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        # Fetch PR metadata
-        pr_resp = await client.get(base, headers=headers)
-        pr_resp.raise_for_status()
-        pr = pr_resp.json()
-
-        # Fetch diff (truncate to ~50k chars to stay within token limits)
-        diff_resp = await client.get(base, headers=diff_headers)
-        diff_resp.raise_for_status()
-        diff = diff_resp.text[:50000]
-
-        # Fetch reviews
-        reviews_resp = await client.get(f"{base}/reviews", headers=headers)
-        reviews_resp.raise_for_status()
-        reviews = [
-            {
-                "author": r["user"]["login"],
-                "state": r["state"],
-                "body": r.get("body", ""),
-            }
-            for r in reviews_resp.json()
-            if r.get("body")
-        ]
-
-        # Fetch review comments (inline code comments)
-        review_comments_resp = await client.get(f"{base}/comments", headers=headers)
-        review_comments_resp.raise_for_status()
-        review_comments = [
-            {
-                "author": c["user"]["login"],
-                "body": c["body"],
-                "path": c.get("path", ""),
-                "line": c.get("original_line"),
-            }
-            for c in review_comments_resp.json()
-        ]
-
-        # Fetch issue comments (general discussion)
-        issue_comments_resp = await client.get(
+    client = await get_client()
+    _prune_http_cache()
+    # Fetch metadata, diff, reviews, review comments (inline code comments)
+    # and issue comments (general discussion) concurrently
+    (
+        pr_body,
+        diff_body,
+        reviews_body,
+        review_comments_body,
+        issue_comments_body,
+    ) = await asyncio.gather(
+        _get_conditional(client, base, headers),
+        _get_conditional(client, base, diff_headers),
+        _get_conditional(client, f"{base}/reviews", headers),
+        _get_conditional(client, f"{base}/comments", headers),
+        _get_conditional(
+            client,
             f"https://api.github.com/repos/{repo}/issues/{pr_number}/comments",
-            headers=headers,
-        )
-        issue_comments_resp.raise_for_status()
-        issue_comments = [
-            {
-                "author": c["user"]["login"],
-                "body": c["body"],
-            }
-            for c in issue_comments_resp.json()
-        ]
+            headers,
+        ),
+    )
+
+    pr = orjson.loads(pr_body)
+
+    # Filter noise, then truncate diff to ~50k chars to stay within token limits
+    diff = _filter_diff(diff_body.decode("utf-8", errors="replace"))[:50000]
+
+    reviews = [
+        {
+            "author": r["user"]["login"],
+            "state": r["state"],
+            "body": r.get("body", ""),
+        }
+        for r in orjson.loads(reviews_body)
+        if r.get("body")
+    ]
+
+    review_comments = [
+        {
+            "author": c["user"]["login"],
+            "body": c["body"],
+            "path": c.get("path", ""),
+            "line": c.get("original_line"),
+        }
+        for c in orjson.loads(review_comments_body)
+    ]
+
+    issue_comments = [
+        {
+            "author": c["user"]["login"],
+            "body": c["body"],
+        }
+        for c in orjson.loads(issue_comments_body)
+    ]
 
     return PRData(
         repo=repo,
@@ -22,6 +22,26 @@ class Settings:
     GITHUB_TOKEN: str = os.getenv("GITHUB_TOKEN", "")
     GITHUB_WEBHOOK_SECRET: str = os.getenv("GITHUB_WEBHOOK_SECRET", "")
 
+    # Reuse LLM scripts for unchanged PRs (FEEDS_DIR/.script_cache); TTL in seconds, 0 = forever
+    SCRIPT_CACHE_ENABLED: bool = os.getenv("SCRIPT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    SCRIPT_CACHE_TTL: int = int(os.getenv("SCRIPT_CACHE_TTL", "0"))
+
+    # Conditional GitHub requests: cached bodies unused for this long are pruned
+    HTTP_CACHE_MAX_AGE_DAYS: int = int(os.getenv("HTTP_CACHE_MAX_AGE_DAYS", "30"))
+
+    # Diff filtering: files matching these globs and hunks longer than
+    # DIFF_MAX_HUNK_LINES are left out of the diff sent to the LLM
+    DIFF_EXCLUDE: list[str] = [
+        p.strip()
+        for p in os.getenv(
+            "DIFF_EXCLUDE",
+            "*.lock,package-lock.json,pnpm-lock.yaml,*.min.js,*.min.css,*.map,"
+            "*.snap,*.pb.go,*_pb2.py,dist/*,vendor/*,node_modules/*",
+        ).split(",")
+        if p.strip()
+    ]
+    DIFF_MAX_HUNK_LINES: int = int(os.getenv("DIFF_MAX_HUNK_LINES", "400"))
+
     # Server
     HOST: str = os.getenv("HOST", "0.0.0.0")
     PORT: int = int(os.getenv("PORT", "8080"))
@@ -30,6 +50,12 @@ class Settings:
     TTS_PROVIDER: str = os.getenv("TTS_PROVIDER", "edge")  # "edge" or "elevenlabs"
     HOST_A_VOICE: str = os.getenv("HOST_A_VOICE", "en-US-AndrewNeural")
     HOST_A_NAME: str = os.getenv("HOST_A_NAME", "Alex")
+    # Max TTS requests in flight at once (Edge/ElevenLabs throttle bursts); at least 1
+    TTS_CONCURRENCY: int = max(1, int(os.getenv("TTS_CONCURRENCY", "4")))
+    # Reuse rendered segments from AUDIO_DIR/.tts_cache across runs
+    TTS_CACHE_ENABLED: bool = os.getenv("TTS_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    # LAME VBR quality for re-encoded episodes: 0 (best) to 9 (smallest); 4 is ~100-130 kbps
+    MP3_QUALITY: int = int(os.getenv("MP3_QUALITY", "4"))
 
     # Kept for future two-host support
     HOST_B_VOICE: str = os.getenv("HOST_B_VOICE", "en-US-JennyNeural")
@@ -39,6 +65,10 @@ class Settings:
     AUDIO_DIR: Path = Path(os.getenv("AUDIO_DIR", "./audio"))
     FEEDS_DIR: Path = Path(os.getenv("FEEDS_DIR", "./feeds"))
     BASE_URL: str = os.getenv("BASE_URL", "https://fraga.github.io/prcast")
+    # Pretty-print JSON written per episode (scripts); compact by default
+    PRETTY_JSON: bool = os.getenv("PRCAST_PRETTY_JSON", "").lower() in ("1", "true", "yes")
+    # Rewrite episodes.jsonl without superseded entries every N episode writes
+    MANIFEST_COMPACT_EVERY: int = int(os.getenv("MANIFEST_COMPACT_EVERY", "100"))
 
     # Podcast metadata
     PODCAST_TITLE: str = os.getenv("PODCAST_TITLE", "PRCast")
@@ -1,13 +1,22 @@
 """RSS feed generator for PRCast."""
 
+import functools
+import hashlib
 import json
 import os
 from datetime import datetime, timezone
 from pathlib import Path
 
+import orjson
+from feedgen.entry import FeedEntry
 from feedgen.feed import FeedGenerator
+from lxml import etree
 
 from prcast.config import settings
+from prcast.manifest import load_manifest
+from prcast.storage import write_atomic
+
+_ITUNES_NS = "http://www.itunes.com/dtds/podcast-1.0.dtd"
 
 
 def _repo_slug(repo: str) -> str:
@@ -15,21 +24,123 @@ def _repo_slug(repo: str) -> str:
     return repo.replace("/", "-").lower()
 
 
-def _repo_image_url(repo: str) -> str:
-    """Resolve per-repo podcast image from JSON map; fallback to PODCAST_IMAGE."""
-    raw = os.getenv("PODCAST_IMAGE_MAP", "").strip()
+@functools.lru_cache(maxsize=1)
+def _parse_image_map(raw: str) -> dict:
+    """Parse PODCAST_IMAGE_MAP once per distinct value."""
     if raw:
         try:
             image_map = json.loads(raw)
             if isinstance(image_map, dict):
-                mapped = image_map.get(repo)
-                if isinstance(mapped, str) and mapped.strip():
-                    return mapped.strip()
+                return image_map
         except json.JSONDecodeError:
             pass
+    return {}
+
+
+def _repo_image_url(repo: str) -> str:
+    """Resolve per-repo podcast image from JSON map; fallback to PODCAST_IMAGE."""
+    mapped = _parse_image_map(os.getenv("PODCAST_IMAGE_MAP", "").strip()).get(repo)
+    if isinstance(mapped, str) and mapped.strip():
+        return mapped.strip()
     return settings.PODCAST_IMAGE
 
 
+def _item_xml(ep: dict, slug: str, title: str, file_size: int) -> str:
+    """Render one episode as an RSS <item> element."""
+    fe = FeedEntry()
+    fe.load_extension("podcast")
+    fe.id(ep["id"])
+    fe.title(title)
+    fe.description(ep["description"])
+    fe.published(ep["pub_date"])
+    fe.link(href=ep.get("pr_url", ""))
+
+    audio_url = f"{settings.BASE_URL}/audio/{slug}/{ep['audio_file']}"
+    fe.enclosure(audio_url, str(file_size), "audio/mpeg")
+    fe.podcast.itunes_duration(ep.get("duration_seconds", 0))
+
+    # Serialize under a parent that declares the prefix, so children come out
+    # as itunes:* rather than ns0:*. lxml still repeats the declaration on
+    # the <item> tag; the channel we splice into already declares it.
+    parent = etree.Element("channel", nsmap={"itunes": _ITUNES_NS})
+    item = fe.rss_entry()
+    parent.append(item)
+    xml = etree.tostring(item, encoding="unicode", pretty_print=True)
+    return xml.replace(f' xmlns:itunes="{_ITUNES_NS}"', "", 1)
+
+
+def _audio_sizes(slugs: set[str]) -> dict[tuple[str, str], int]:
+    """Sizes of files under AUDIO_DIR/<slug>/, from one directory scan per slug."""
+    sizes = {}
+    for slug in slugs:
+        try:
+            with os.scandir(settings.AUDIO_DIR / slug) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        sizes[(slug, entry.name)] = entry.stat().st_size
+        except FileNotFoundError:
+            continue
+    return sizes
+
+
+def _render_items(
+    cache_name: str,
+    episodes: list[dict],
+    slug: str | None = None,
+    repo_in_title: bool = False,
+) -> list[str]:
+    """Return <item> XML for every episode, re-rendering only new or changed ones.
+
+    Rendered items are kept in FEEDS_DIR/.feed_cache/<cache_name>.json keyed
+    by episode id, together with a hash of everything that goes into them.
+    """
+    cache_path = settings.FEEDS_DIR / ".feed_cache" / f"{cache_name}.json"
+    try:
+        cache = orjson.loads(cache_path.read_bytes()) if cache_path.exists() else {}
+    except orjson.JSONDecodeError:
+        cache = {}  # unreadable cache: re-render every item
+
+    slugs = {slug} if slug else {_repo_slug(ep["repo"]) for ep in episodes}
+    sizes = _audio_sizes(slugs)
+
+    fresh = {}
+    items = []
+    for ep in sorted(episodes, key=lambda e: e["pub_date"], reverse=True):
+        ep_slug = slug or _repo_slug(ep["repo"])
+        title = f"[{ep['repo']}] {ep['title']}" if repo_in_title else ep["title"]
+        file_size = sizes.get((ep_slug, ep["audio_file"]), 0)
+
+        sig = hashlib.blake2b(
+            orjson.dumps(
+                [ep, ep_slug, title, file_size, settings.BASE_URL],
+                default=str,
+                option=orjson.OPT_SORT_KEYS,
+            ),
+            digest_size=16,
+        ).hexdigest()
+        cached = cache.get(ep["id"])
+        if cached and cached[0] == sig:
+            xml = cached[1]
+        else:
+            xml = _item_xml(ep, ep_slug, title, file_size)
+        fresh[ep["id"]] = [sig, xml]
+        items.append(xml)
+
+    if fresh != cache:
+        write_atomic(cache_path, orjson.dumps(fresh))
+
+    # feedgen prepends entries as they are added; keep the same document order
+    items.reverse()
+    return items
+
+
+def _write_feed(fg: FeedGenerator, items: list[str], feed_path: Path):
+    """Write the channel rendered by `fg` with pre-rendered items spliced in."""
+    envelope = fg.rss_str(pretty=True).decode("utf-8")
+    head, tail = envelope.rsplit("</channel>", 1)
+    feed_path.write_text(head + "".join(items) + "</channel>" + tail, encoding="utf-8")
+
+
 def generate_feed(
     repo: str,
     episodes: list[dict],
@@ -72,23 +183,8 @@ def generate_feed(
     if repo_image:
         fg.podcast.itunes_image(repo_image)
 
-    # Episodes (newest first)
-    for ep in sorted(episodes, key=lambda e: e["pub_date"], reverse=True):
-        fe = fg.add_entry()
-        fe.id(ep["id"])
-        fe.title(ep["title"])
-        fe.description(ep["description"])
-        fe.published(ep["pub_date"])
-        fe.link(href=ep.get("pr_url", ""))
-
-        audio_url = f"{settings.BASE_URL}/audio/{slug}/{ep['audio_file']}"
-        audio_path = settings.AUDIO_DIR / slug / ep["audio_file"]
-        file_size = audio_path.stat().st_size if audio_path.exists() else 0
-
-        fe.enclosure(audio_url, str(file_size), "audio/mpeg")
-        fe.podcast.itunes_duration(ep.get("duration_seconds", 0))
-
-    fg.rss_file(str(feed_path), pretty=True)
+    # Episodes
+    _write_feed(fg, _render_items(slug, episodes, slug=slug), feed_path)
     return feed_path
 
 
@@ -113,25 +209,6 @@ def generate_master_feed(repos: list[str]) -> Path:
         fg.podcast.itunes_image(settings.PODCAST_IMAGE)
 
     # Load episodes from episode manifest
-    manifest_path = settings.FEEDS_DIR / "episodes.json"
-    if manifest_path.exists():
-        import json
-        all_episodes = json.loads(manifest_path.read_text())
-        for ep in sorted(all_episodes, key=lambda e: e["pub_date"], reverse=True):
-            slug = _repo_slug(ep["repo"])
-            fe = fg.add_entry()
-            fe.id(ep["id"])
-            fe.title(f"[{ep['repo']}] {ep['title']}")
-            fe.description(ep["description"])
-            fe.published(ep["pub_date"])
-            fe.link(href=ep.get("pr_url", ""))
-
-            audio_url = f"{settings.BASE_URL}/audio/{slug}/{ep['audio_file']}"
-            audio_path = settings.AUDIO_DIR / slug / ep["audio_file"]
-            file_size = audio_path.stat().st_size if audio_path.exists() else 0
-
-            fe.enclosure(audio_url, str(file_size), "audio/mpeg")
-            fe.podcast.itunes_duration(ep.get("duration_seconds", 0))
-
-    fg.rss_file(str(feed_path), pretty=True)
+    items = _render_items("prcast", load_manifest(), repo_in_title=True)
+    _write_feed(fg, items, feed_path)
     return feed_path
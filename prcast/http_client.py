@@ -0,0 +1,25 @@
+"""Shared HTTP client so GitHub, LLM and TTS calls reuse pooled connections."""
+
+import httpx
+
+_client: httpx.AsyncClient | None = None
+
+
+async def get_client() -> httpx.AsyncClient:
+    """Return the process-wide client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            timeout=120,
+            limits=httpx.Limits(max_keepalive_connections=32),
+        )
+    return _client
+
+
+async def close_client():
+    """Close the shared client. Call before the event loop shuts down."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,96 @@
+"""Episode manifest -- append-only JSONL with periodic compaction."""
+
+import orjson
+
+from prcast.config import settings
+from prcast.storage import write_atomic
+
+
+def _manifest_path():
+    return settings.FEEDS_DIR / "episodes.jsonl"
+
+
+def _migrate_legacy():
+    """Convert the old pretty-printed episodes.json into JSONL once."""
+    legacy_path = settings.FEEDS_DIR / "episodes.json"
+    if legacy_path.exists() and not _manifest_path().exists():
+        _write_compacted(orjson.loads(legacy_path.read_bytes()))
+        legacy_path.unlink()
+
+
+def _write_compacted(episodes: list[dict]):
+    write_atomic(_manifest_path(), b"".join(
+        orjson.dumps(ep, default=str, option=orjson.OPT_APPEND_NEWLINE)
+        for ep in episodes
+    ))
+
+
+def _repair_tail(path):
+    """Make sure the manifest ends on a line boundary before appending.
+
+    An interrupted append leaves a fragment without its newline; appending
+    straight onto it would corrupt the next record too. A complete record
+    that merely lacks the newline gets one; a fragment is truncated away.
+    """
+    with path.open("rb+") as f:
+        size = f.seek(0, 2)
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        # Rare path, so reading the whole file to find the last newline is fine
+        f.seek(0)
+        data = f.read()
+        cut = data.rfind(b"\n") + 1
+        try:
+            orjson.loads(data[cut:])
+        except orjson.JSONDecodeError:
+            f.truncate(cut)
+        else:
+            f.write(b"\n")
+
+
+def load_manifest() -> list[dict]:
+    """Return all episodes, oldest first. Later lines replace earlier ones with the same id."""
+    _migrate_legacy()
+    path = _manifest_path()
+    if not path.exists():
+        return []
+
+    episodes: dict[str, dict] = {}
+    with path.open("rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                ep = orjson.loads(line)
+            except orjson.JSONDecodeError as e:
+                # Only the final, unterminated line can be an interrupted append
+                if not line.endswith(b"\n"):
+                    continue
+                raise ValueError(f"Corrupt episode manifest {path}: {e}") from e
+            # Re-processed PRs move to the end, as if the old entry was removed
+            episodes.pop(ep["id"], None)
+            episodes[ep["id"]] = ep
+    return list(episodes.values())
+
+
+def upsert_episode(episode: dict):
+    """Append an episode, compacting away superseded lines every N writes."""
+    _migrate_legacy()
+    path = _manifest_path()
+    if path.exists():
+        _repair_tail(path)
+    with path.open("ab") as f:
+        f.write(orjson.dumps(episode, default=str, option=orjson.OPT_APPEND_NEWLINE))
+
+    counter_path = settings.FEEDS_DIR / ".compact_counter"
+    try:
+        writes = int(counter_path.read_text()) + 1
+    except (FileNotFoundError, ValueError):
+        writes = 1  # missing or garbled counter: start counting again
+    if writes >= settings.MANIFEST_COMPACT_EVERY:
+        _write_compacted(load_manifest())
+        writes = 0
+    write_atomic(counter_path, str(writes).encode())
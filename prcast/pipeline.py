@@ -1,15 +1,15 @@
 """Main pipeline -- orchestrates PR collection, script generation, audio, and feed."""
 
-import json
 from datetime import datetime, timezone
 from pathlib import Path
 
-from pydub import AudioSegment
+import orjson
 
 from prcast.collector import collect_pr
 from prcast.scriptwriter import generate_script
 from prcast.audio import render_episode
 from prcast.feed import generate_feed, generate_master_feed
+from prcast.manifest import load_manifest, upsert_episode
 from prcast.config import settings
 
 
@@ -17,18 +17,6 @@ def _repo_slug(repo: str) -> str:
     return repo.replace("/", "-").lower()
 
 
-def _load_manifest() -> list[dict]:
-    manifest_path = settings.FEEDS_DIR / "episodes.json"
-    if manifest_path.exists():
-        return json.loads(manifest_path.read_text())
-    return []
-
-
-def _save_manifest(episodes: list[dict]):
-    manifest_path = settings.FEEDS_DIR / "episodes.json"
-    manifest_path.write_text(json.dumps(episodes, indent=2, default=str))
-
-
 async def process_pr(repo: str, pr_number: int) -> dict:
     """Full pipeline: collect -> script -> audio -> feed. Returns episode info."""
     print(f"[PRCast] Processing {repo}#{pr_number}...")
@@ -46,12 +34,11 @@ async def process_pr(repo: str, pr_number: int) -> dict:
     slug = _repo_slug(repo)
     episode_id = f"{slug}-pr-{pr_number}"
     print(f"  Rendering audio...")
-    audio_path = await render_episode(script, episode_id, slug)
+    audio_path, duration_ms = await render_episode(script, episode_id, slug)
     print(f"  Audio: {audio_path}")
 
     # 4. Get duration
-    audio = AudioSegment.from_mp3(str(audio_path))
-    duration_seconds = int(len(audio) / 1000)
+    duration_seconds = int(duration_ms / 1000)
 
     # 5. Build episode metadata
     episode = {
@@ -75,23 +62,21 @@ async def process_pr(repo: str, pr_number: int) -> dict:
     script_dir = settings.FEEDS_DIR / "scripts"
     script_dir.mkdir(exist_ok=True)
     script_path = script_dir / f"{episode_id}.json"
-    script_path.write_text(json.dumps({
-        "episode": episode,
-        "script": script,
-    }, indent=2))
+    script_path.write_bytes(orjson.dumps(
+        {"episode": episode, "script": script},
+        option=orjson.OPT_INDENT_2 if settings.PRETTY_JSON else 0,
+    ))
 
     # 7. Update manifest and feeds
-    manifest = _load_manifest()
-    # Remove old episode for same PR if re-processing
-    manifest = [e for e in manifest if e["id"] != episode_id]
-    manifest.append(episode)
-    _save_manifest(manifest)
+    # Re-processing a PR supersedes its old entry
+    upsert_episode(episode)
+    manifest = load_manifest()
 
     # 8. Generate repo feed + master feed
     repo_episodes = [e for e in manifest if e["repo"] == repo]
     generate_feed(repo, repo_episodes)
 
-    all_repos = list(set(e["repo"] for e in manifest))
+    all_repos = list(dict.fromkeys(e["repo"] for e in manifest))
     generate_master_feed(all_repos)
 
     print(f"[PRCast] Done: {episode_id} ({duration_seconds}s)")
@@ -1,9 +1,16 @@
 """Generate podcast script from PR data -- supports OpenAI, Gemini, and Anthropic."""
 
+import hashlib
+import json
 import os
-import httpx
+import re
+import time
+from pathlib import Path
+
 from prcast.collector import PRData
 from prcast.config import settings
+from prcast.http_client import get_client
+from prcast.storage import write_atomic
 
 
 SYSTEM_PROMPT = """You are a podcast script writer for PRCast, a developer podcast that covers Pull Requests.
@@ -48,6 +55,12 @@ EPISODE_PROMPT = """Generate a podcast monologue for this Pull Request:
 Write the monologue now.
 """
 
+_PARA_RE = re.compile(r"\n\s*\n")
+_MIN_SEGMENT_CHARS = 30
+
+# The host name is fixed for the life of the process, so format once
+_SYSTEM_PROMPT_FORMATTED = SYSTEM_PROMPT.format(host=settings.HOST_A_NAME)
+
 
 def _format_reviews(reviews: list[dict]) -> str:
     if not reviews:
@@ -67,7 +80,7 @@ def _format_comments(comments: list[dict]) -> str:
 
 def _build_prompt(pr: PRData) -> tuple[str, str]:
     """Returns (system_prompt, user_prompt)."""
-    system = SYSTEM_PROMPT.format(host=settings.HOST_A_NAME)
+    system = _SYSTEM_PROMPT_FORMATTED
     user = EPISODE_PROMPT.format(
         repo=pr.repo,
         number=pr.number,
@@ -88,25 +101,25 @@ def _build_prompt(pr: PRData) -> tuple[str, str]:
 
 async def _generate_openai(system: str, user: str) -> str:
     """Generate via OpenAI API (GPT-4o, etc.)."""
-    async with httpx.AsyncClient(timeout=120) as client:
-        resp = await client.post(
-            f"{settings.OPENAI_BASE_URL}/chat/completions",
-            headers={
-                "Authorization": f"Bearer {settings.OPENAI_API_KEY}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": settings.LLM_MODEL,
-                "messages": [
-                    {"role": "system", "content": system},
-                    {"role": "user", "content": user},
-                ],
-                "temperature": 0.9,
-                "max_tokens": 4096,
-            },
-        )
-        resp.raise_for_status()
-        return resp.json()["choices"][0]["message"]["content"]
+    client = await get_client()
+    resp = await client.post(
+        f"{settings.OPENAI_BASE_URL}/chat/completions",
+        headers={
+            "Authorization": f"Bearer {settings.OPENAI_API_KEY}",
+            "Content-Type": "application/json",
+        },
+        json={
+            "model": settings.LLM_MODEL,
+            "messages": [
+                {"role": "system", "content": system},
+                {"role": "user", "content": user},
+            ],
+            "temperature": 0.9,
+            "max_tokens": 4096,
+        },
+    )
+    resp.raise_for_status()
+    return resp.json()["choices"][0]["message"]["content"]
 
 
 async def _generate_gemini(system: str, user: str) -> str:
@@ -128,24 +141,24 @@ async def _generate_gemini(system: str, user: str) -> str:
 
 async def _generate_anthropic(system: str, user: str) -> str:
     """Generate via Anthropic Claude API."""
-    async with httpx.AsyncClient(timeout=120) as client:
-        resp = await client.post(
-            "https://api.anthropic.com/v1/messages",
-            headers={
-                "x-api-key": settings.ANTHROPIC_API_KEY,
-                "anthropic-version": "2023-06-01",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": settings.LLM_MODEL,
-                "system": system,
-                "messages": [{"role": "user", "content": user}],
-                "temperature": 0.9,
-                "max_tokens": 4096,
-            },
-        )
-        resp.raise_for_status()
-        return resp.json()["content"][0]["text"]
+    client = await get_client()
+    resp = await client.post(
+        "https://api.anthropic.com/v1/messages",
+        headers={
+            "x-api-key": settings.ANTHROPIC_API_KEY,
+            "anthropic-version": "2023-06-01",
+            "Content-Type": "application/json",
+        },
+        json={
+            "model": settings.LLM_MODEL,
+            "system": system,
+            "messages": [{"role": "user", "content": user}],
+            "temperature": 0.9,
+            "max_tokens": 4096,
+        },
+    )
+    resp.raise_for_status()
+    return resp.json()["content"][0]["text"]
 
 
 PROVIDERS = {
@@ -155,10 +168,43 @@ PROVIDERS = {
 }
 
 
+def _script_cache_path(system: str, user: str) -> Path:
+    """Cache location keyed by the exact prompts sent to the LLM.
+
+    Hashing the built prompts rather than the PR fields means template
+    edits and truncation changes invalidate old entries too.
+    """
+    sig = hashlib.blake2b(
+        json.dumps({
+            "provider": settings.LLM_PROVIDER,
+            "model": settings.LLM_MODEL,
+            "system": system,
+            "user": user,
+        }, sort_keys=True).encode(),
+        digest_size=16,
+    ).hexdigest()
+    return settings.FEEDS_DIR / ".script_cache" / f"{sig}.json"
+
+
+def _load_cached_script(path: Path) -> str | None:
+    """Cached LLM output, or None if missing, expired or unreadable."""
+    if not path.exists():
+        return None
+    ttl = settings.SCRIPT_CACHE_TTL
+    if ttl and time.time() - path.stat().st_mtime > ttl:
+        return None
+    try:
+        raw = json.loads(path.read_text())["raw"]
+    except (ValueError, KeyError, TypeError):
+        return None
+    return raw if isinstance(raw, str) else None
+
+
 async def generate_script(pr: PRData) -> list[dict]:
-    """Generate a monologue script. Returns list of {speaker, text} segments."""
-    system, user = _build_prompt(pr)
+    """Generate a monologue script. Returns list of {speaker, text} segments.
 
+    Unchanged PRs reuse the previous LLM output instead of paying for a new one.
+    """
     provider = settings.LLM_PROVIDER
     if provider not in PROVIDERS:
         raise ValueError(
@@ -166,22 +212,51 @@ async def generate_script(pr: PRData) -> list[dict]:
             f"Supported: {', '.join(PROVIDERS.keys())}"
         )
 
-    raw = await PROVIDERS[provider](system, user)
+    system, user = _build_prompt(pr)
+    cache_path = _script_cache_path(system, user) if settings.SCRIPT_CACHE_ENABLED else None
+    raw = _load_cached_script(cache_path) if cache_path else None
+    if raw is None:
+        raw = await PROVIDERS[provider](system, user)
+        segments = _parse_monologue(raw)
+        if not segments:
+            # Checked before caching so a blank response is retried next run
+            raise ValueError(f"{provider} returned an empty script for {pr.repo}#{pr.number}")
+        if cache_path:
+            write_atomic(cache_path, json.dumps({"raw": raw}).encode())
+        return segments
+
     return _parse_monologue(raw)
 
 
 def _parse_monologue(raw: str) -> list[dict]:
     """Parse monologue into segments for TTS rendering.
 
-    Splits on paragraph breaks so TTS gets natural pauses.
-    Each segment is attributed to the single host.
+    Splits on paragraph breaks (any run of blank lines) so TTS gets natural
+    pauses. Each segment is attributed to the single host.
     """
     segments = []
-    for paragraph in raw.strip().split("\n\n"):
+    leading = ""  # short fragments seen before the first full paragraph
+    for paragraph in _PARA_RE.split(raw.strip()):
         text = paragraph.strip()
-        if text:
-            segments.append({
-                "speaker": settings.HOST_A_NAME,
-                "text": text,
-            })
+        if not text:
+            continue
+        # Fold very short paragraphs into a neighbour: each segment is a
+        # separate TTS request, and lone fragments read with odd prosody
+        if len(text) < _MIN_SEGMENT_CHARS:
+            if segments:
+                segments[-1]["text"] += " " + text
+            else:
+                leading = f"{leading} {text}".lstrip()
+            continue
+        segments.append({
+            "speaker": settings.HOST_A_NAME,
+            "text": f"{leading} {text}".lstrip(),
+        })
+        leading = ""
+    if leading:
+        # The whole script was short fragments; keep them as one segment
+        segments.append({
+            "speaker": settings.HOST_A_NAME,
+            "text": leading,
+        })
     return segments
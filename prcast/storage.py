@@ -0,0 +1,24 @@
+"""Small helpers for the on-disk caches and state files."""
+
+import contextlib
+import os
+import tempfile
+from pathlib import Path
+
+
+def write_atomic(path: Path, data: bytes):
+    """Write `data` so readers see either the old file or the complete new one.
+
+    The bytes go to a temp file in the same directory, which is then renamed
+    over `path`; an interrupted run never leaves a truncated file behind.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp)
+        raise
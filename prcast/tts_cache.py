@@ -0,0 +1,34 @@
+"""On-disk cache of rendered TTS segments, keyed by provider, voice and text."""
+
+import hashlib
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from prcast.config import settings
+from prcast.storage import write_atomic
+
+
+def _cache_path(text: str, voice: str, provider: str) -> Path:
+    key = hashlib.blake2b(
+        f"{provider}|{voice}|{text}".encode(), digest_size=16
+    ).hexdigest()
+    return settings.AUDIO_DIR / ".tts_cache" / f"{key}.mp3"
+
+
+async def get_or_render(
+    text: str,
+    voice: str,
+    provider: str,
+    render: Callable[[str, str], Awaitable[bytes]],
+) -> bytes:
+    """Return MP3 bytes for `text`, calling `render(text, voice)` only on a cache miss."""
+    if not settings.TTS_CACHE_ENABLED:
+        return await render(text, voice)
+
+    cached = _cache_path(text, voice, provider)
+    if cached.exists():
+        return cached.read_bytes()
+
+    audio = await render(text, voice)
+    write_atomic(cached, audio)
+    return audio